@@ -1,12 +1,47 @@
 import streamlit as st
-import matplotlib.pyplot as plt
+import matplotlib
+matplotlib.use('Agg')  # Render off-screen before anything imports pyplot
+from matplotlib.figure import Figure
 import numpy as np
 import time
 import json
+import io
+from functools import lru_cache
 from game_logic import GameState, Obstacle
-from question_generator import QuestionGenerator
+from question_generator import QuestionGenerator, _build_function
 from score_manager import ScoreManager
-from math_utils import RationalFunction
+
+CANVAS_WIDTH = 60
+CANVAS_HEIGHT = 8
+
+# Dinosaur sprites as (body, feet) columns: two running frames and the jump pose
+DINO_FRAMES = (('🦕', '‾'), ('🦕', '¯'))
+DINO_JUMP = ('🦕', '↑')
+
+def _build_canvas_background() -> np.ndarray:
+    """Build the static parts of the game canvas: ground, distance markers and clouds"""
+    background = np.full((CANVAS_HEIGHT, CANVAS_WIDTH), ' ', dtype='<U1')
+    
+    # Draw ground with distance markers
+    background[-1, :] = '─'
+    background[-1, ::10] = '+'
+    
+    # Add some clouds for atmosphere
+    cloud_positions = np.array([15, 35, 50])
+    background[1, cloud_positions] = '☁'
+    background[1, cloud_positions + 1] = '☁'
+    background[2, cloud_positions] = '☁'
+    
+    # End every row with a newline cell so the whole canvas serializes with one join
+    newlines = np.full((CANVAS_HEIGHT, 1), '\n', dtype='<U1')
+    return np.concatenate([background, newlines], axis=1)
+
+CANVAS_BACKGROUND = _build_canvas_background()
+
+@st.cache_resource
+def get_score_manager() -> ScoreManager:
+    """Shared leaderboard for all sessions, so they read and write one scores file"""
+    return ScoreManager()
 
 # Initialize session state
 if 'game_state' not in st.session_state:
@@ -14,7 +49,7 @@ if 'game_state' not in st.session_state:
 if 'question_gen' not in st.session_state:
     st.session_state.question_gen = QuestionGenerator()
 if 'score_manager' not in st.session_state:
-    st.session_state.score_manager = ScoreManager()
+    st.session_state.score_manager = get_score_manager()
 if 'current_question' not in st.session_state:
     st.session_state.current_question = None
 if 'player_name' not in st.session_state:
@@ -40,58 +75,46 @@ def start_game():
 
 def render_game_canvas():
     """Create a visual ASCII representation of the game"""
-    canvas_width = 60
-    canvas_height = 8
+    canvas_width = CANVAS_WIDTH
+    game_state = st.session_state.game_state
+    
+    # Work out what is visible this frame; positions are quantized to whole cells
+    is_jumping = game_state.is_jumping
+    animation_frame = None if is_jumping else int(game_state.distance) & 1
+    obstacle_cells = tuple(
+        (int(x_pos), cactus_type)
+        for x_pos, cactus_type in zip(game_state.obstacle_x.tolist(), game_state.obstacle_cactus)
+        if 0 <= x_pos <= canvas_width - 5 and int(x_pos) < canvas_width - 2
+    )
     
-    # Initialize canvas with spaces
-    canvas = [[' ' for _ in range(canvas_width)] for _ in range(canvas_height)]
+    # Most ticks don't move anything by a whole cell, so this usually reuses the last drawing
+    return _draw_game_canvas(is_jumping, animation_frame, obstacle_cells)
+
+# Shared by all sessions; lru_cache keeps lookups and eviction thread-safe
+@lru_cache(maxsize=256)
+def _draw_game_canvas(is_jumping: bool, animation_frame, obstacle_cells: tuple) -> str:
+    """Draw the canvas for one arrangement of dinosaur and obstacle cells"""
+    canvas_height = CANVAS_HEIGHT
     
-    # Draw ground
-    for i in range(canvas_width):
-        canvas[canvas_height - 1][i] = '─'
+    # Start from a copy of the static background
+    canvas = CANVAS_BACKGROUND.copy()
     
     # Draw dinosaur with emoji
     dino_pos = 5  # Fixed position for dinosaur
-    if st.session_state.game_state.is_jumping:
+    if is_jumping:
         # Jumping dinosaur
-        canvas[canvas_height - 4][dino_pos] = '🦕'
-        canvas[canvas_height - 3][dino_pos] = '↑'
+        canvas[canvas_height - 4:canvas_height - 2, dino_pos] = DINO_JUMP
     else:
         # Running dinosaur with simple animation
-        animation_frame = int(st.session_state.game_state.distance) % 2
-        if animation_frame == 0:
-            canvas[canvas_height - 2][dino_pos] = '🦕'
-            canvas[canvas_height - 1][dino_pos] = '‾'
-        else:
-            canvas[canvas_height - 2][dino_pos] = '🦕'
-            canvas[canvas_height - 1][dino_pos] = '¯'
+        canvas[canvas_height - 2:, dino_pos] = DINO_FRAMES[animation_frame]
     
     # Draw obstacles (emoji cactuses)
-    for obstacle in st.session_state.game_state.obstacles:
-        if 0 <= obstacle.x_pos <= canvas_width - 5:
-            obstacle_screen_pos = int(obstacle.x_pos)
-            if obstacle_screen_pos < canvas_width - 2:
-                # Draw cactus using the obstacle's cactus type
-                canvas[canvas_height - 2][obstacle_screen_pos] = obstacle.cactus_type
-                canvas[canvas_height - 3][obstacle_screen_pos] = '|'
-    
-    # Add distance markers
-    for i in range(0, canvas_width, 10):
-        if i < canvas_width:
-            canvas[canvas_height - 1][i] = '+'
-    
-    # Add some clouds for atmosphere
-    cloud_positions = [15, 35, 50]
-    for pos in cloud_positions:
-        if pos < canvas_width - 3:
-            canvas[1][pos] = '☁'
-            canvas[1][pos + 1] = '☁'
-            canvas[2][pos] = '☁'
+    for obstacle_screen_pos, cactus_type in obstacle_cells:
+        canvas[canvas_height - 2, obstacle_screen_pos] = cactus_type
+        canvas[canvas_height - 3, obstacle_screen_pos] = '|'
     
     # Convert canvas to string
-    canvas_str = '\n'.join([''.join(row) for row in canvas])
-    
-    return canvas_str
+    return ''.join(canvas.ravel().tolist())[:-1]
 
 def handle_answer(answer):
     """Handle player's answer to the question"""
@@ -105,33 +128,64 @@ def handle_answer(answer):
             st.session_state.game_state.game_over = True
             st.error(f"Incorrect! The correct answer was: {st.session_state.current_question.correct_answer}")
             st.session_state.score_manager.add_score(st.session_state.player_name, st.session_state.game_state.score)
+            st.session_state.score_manager.flush()  # Persist right away; the exit hook is only a backstop
         
         # Generate new question for next obstacle
         st.session_state.current_question = st.session_state.question_gen.generate_question()
         time.sleep(1)  # Brief pause
         st.rerun()
 
-def render_game():
-    """Render the main game interface"""
-    st.title("🦕 Rational Function Runner")
+@st.cache_data(max_entries=64)
+def render_function_plot(numerator: tuple, denominator: tuple) -> bytes:
+    """Render the graph of a rational function to PNG, cached per coefficient set"""
+    # A standalone Figure never enters pyplot's global registry, so nothing lingers after saving
+    fig = Figure(figsize=(5, 4))
+    ax = fig.subplots()
+    # Reuse the generator's cached instance so the sympy analysis isn't redone for the plot
+    _build_function(numerator, denominator).plot(ax)
+    
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=200, bbox_inches='tight')
+    return buffer.getvalue()
+
+def question_is_due() -> bool:
+    """Check whether an obstacle is close enough to show the current question"""
+    game_state = st.session_state.game_state
+    if st.session_state.current_question and game_state.obstacle_x.size:
+        return bool(game_state.obstacle_x.min() < 50)  # Show question when obstacle is much farther away
+    return False
+
+@st.fragment(run_every=0.1)
+def render_game_area(question_shown: bool):
+    """Render the animated part of the game; Streamlit reruns only this fragment on each tick"""
+    game_state = st.session_state.game_state
+    
+    # Auto-update game state
+    game_state.update()
+    
+    # Rerun the whole app when the game ends or the question panel needs to appear/disappear
+    if game_state.game_over or question_is_due() != question_shown:
+        st.rerun()
+    
+    # Read the clock once for every countdown on this tick
+    current_time = time.time()
+    time_since_start = current_time - game_state.game_start_time
     
     # Game info
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        st.metric("Score", st.session_state.game_state.score)
+        st.metric("Score", game_state.score)
     with col2:
-        st.metric("Distance", f"{st.session_state.game_state.distance:.1f}m")
+        st.metric("Distance", f"{game_state.distance:.1f}m")
     with col3:
-        st.metric("Speed", f"{st.session_state.game_state.speed:.1f}")
+        st.metric("Speed", f"{game_state.speed:.1f}")
     with col4:
         # Show countdown to next obstacle
-        current_time = time.time()
-        time_since_start = current_time - st.session_state.game_state.game_start_time
-        if len(st.session_state.game_state.obstacles) == 0:
+        if game_state.obstacle_x.size == 0:
             time_to_first_obstacle = max(0, 60.0 - time_since_start)
             st.metric("Next Obstacle", f"{time_to_first_obstacle:.1f}s")
         else:
-            time_since_last = current_time - st.session_state.game_state.last_obstacle_time
+            time_since_last = current_time - game_state.last_obstacle_time
             time_to_next = max(0, 45.0 - time_since_last)  # Minimum time to next
             st.metric("Next Obstacle", f"{time_to_next:.1f}s")
     
@@ -143,45 +197,48 @@ def render_game():
     st.markdown(f"```\n{game_canvas}\n```")
     
     # Show helpful timing message if no obstacles yet
-    if len(st.session_state.game_state.obstacles) == 0:
-        current_time = time.time()
-        time_since_start = current_time - st.session_state.game_state.game_start_time
-        if time_since_start < 60:
-            st.info(f"🕐 Get ready! Your first question will appear in {60 - time_since_start:.1f} seconds. You'll have plenty of time to answer!")
+    if game_state.obstacle_x.size == 0 and time_since_start < 60:
+        st.info(f"🕐 Get ready! Your first question will appear in {60 - time_since_start:.1f} seconds. You'll have plenty of time to answer!")
+
+def render_game():
+    """Render the main game interface"""
+    st.title("🦕 Rational Function Runner")
     
-    # Show current question if there's an obstacle approaching (increased distance for more time)
-    if st.session_state.current_question and st.session_state.game_state.obstacles:
-        next_obstacle = min(st.session_state.game_state.obstacles, key=lambda x: x.x_pos)
-        if next_obstacle.x_pos < 50:  # Show question when obstacle is much farther away
-            st.subheader("🚨 Obstacle Approaching! Answer to Jump!")
-            
-            # Create two columns - question on left, graph on right
-            question_col, graph_col = st.columns([2, 1])
+    # Animated game area (metrics + canvas) refreshes on its own timer
+    question_shown = question_is_due()
+    render_game_area(question_shown)
+    
+    # Show current question if there's an obstacle approaching (kept outside the
+    # fragment so answering doesn't race with the animation tick)
+    if question_shown:
+        st.subheader("🚨 Obstacle Approaching! Answer to Jump!")
+        
+        # Create two columns - question on left, graph on right
+        question_col, graph_col = st.columns([2, 1])
+        
+        with question_col:
+            # Display the rational function
+            st.write("**Rational Function:**")
+            st.latex(st.session_state.current_question.function.to_latex())
             
-            with question_col:
-                # Display the rational function
-                st.write("**Rational Function:**")
-                st.latex(st.session_state.current_question.function.to_latex())
-                
-                # Display the question
-                st.write(f"**Question:** {st.session_state.current_question.question}")
-                
-                # Answer input
-                if st.session_state.current_question.question_type == "multiple_choice":
-                    answer = st.radio("Choose your answer:", st.session_state.current_question.options)
-                    if st.button("Submit Answer"):
-                        handle_answer(answer)
-                else:
-                    answer = st.text_input("Enter your answer:")
-                    if st.button("Submit Answer"):
-                        handle_answer(answer)
+            # Display the question
+            st.write(f"**Question:** {st.session_state.current_question.question}")
             
-            with graph_col:
-                # Show the graph - smaller size
-                st.write("**Graph:**")
-                fig, ax = plt.subplots(figsize=(5, 4))
-                st.session_state.current_question.function.plot(ax)
-                st.pyplot(fig)
+            # Answer input
+            if st.session_state.current_question.question_type == "multiple_choice":
+                answer = st.radio("Choose your answer:", st.session_state.current_question.options)
+                if st.button("Submit Answer"):
+                    handle_answer(answer)
+            else:
+                answer = st.text_input("Enter your answer:")
+                if st.button("Submit Answer"):
+                    handle_answer(answer)
+        
+        with graph_col:
+            # Show the graph - smaller size
+            st.write("**Graph:**")
+            function = st.session_state.current_question.function
+            st.image(render_function_plot(tuple(function.numerator), tuple(function.denominator)))
     
     # Game controls
     st.subheader("Controls")
@@ -189,16 +246,11 @@ def render_game():
     with col1:
         if st.button("🔄 Reset Game"):
             reset_game()
+            st.rerun()
     with col2:
         if st.button("🏆 Show Leaderboard"):
             st.session_state.show_leaderboard = True
             st.rerun()
-    
-    # Auto-update game state
-    if not st.session_state.game_state.game_over:
-        st.session_state.game_state.update()
-        time.sleep(0.1)
-        st.rerun()
 
 def render_game_over():
     """Render game over screen"""
@@ -222,15 +274,10 @@ def render_leaderboard():
     scores = st.session_state.score_manager.get_top_scores()
     
     if scores:
-        for i, (name, score) in enumerate(scores, 1):
-            if i == 1:
-                st.write(f"🥇 {i}. {name} - {score} points")
-            elif i == 2:
-                st.write(f"🥈 {i}. {name} - {score} points")
-            elif i == 3:
-                st.write(f"🥉 {i}. {name} - {score} points")
-            else:
-                st.write(f"{i}. {name} - {score} points")
+        # Send the whole board as one markdown element instead of one per row
+        medals = {1: "🥇 ", 2: "🥈 ", 3: "🥉 "}
+        lines = [f"{medals.get(i, '')}{i}. {name} - {score} points" for i, (name, score) in enumerate(scores, 1)]
+        st.markdown("\n\n".join(lines))
     else:
         st.write("No scores yet! Be the first to play!")
     
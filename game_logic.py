@@ -1,6 +1,7 @@
 import random
 import time
-from typing import List
+import numpy as np
+from typing import List, NamedTuple
 
 class Obstacle:
     """Represents an obstacle in the game"""
@@ -16,6 +17,11 @@ class Obstacle:
         """Update obstacle position"""
         self.x_pos -= speed
 
+class ObstacleView(NamedTuple):
+    """Read-only view of a single obstacle for rendering code"""
+    x_pos: float
+    cactus_type: str
+
 class GameState:
     """Manages the overall game state"""
     def __init__(self):
@@ -29,7 +35,9 @@ class GameState:
         self.is_jumping = False
         self.jump_timer = 0
         self.game_over = False
-        self.obstacles: List[Obstacle] = []
+        # Obstacles are stored as parallel arrays so a frame updates them all at once
+        self.obstacle_x = np.empty(0, dtype=np.float64)
+        self.obstacle_cactus = np.empty(0, dtype=object)
         self.last_obstacle_time = time.time()  # Set to current time so first obstacle waits full interval
         self.last_update_time = time.time()
         self.game_start_time = time.time()  # Track when game started for countdown
@@ -57,26 +65,37 @@ class GameState:
                 self.is_jumping = False
         
         # Spawn new obstacles (first obstacle after 60 seconds, then 45-60 second intervals)
-        if len(self.obstacles) == 0 and current_time - self.last_obstacle_time > 60.0:
+        if self.obstacle_x.size == 0 and current_time - self.last_obstacle_time > 60.0:
             # First obstacle after exactly 60 seconds
-            self.obstacles.append(Obstacle(50.0))
+            self._spawn_obstacle(50.0)
             self.last_obstacle_time = current_time
-        elif len(self.obstacles) > 0 and current_time - self.last_obstacle_time > random.uniform(45.0, 60.0):
+        elif self.obstacle_x.size > 0 and current_time - self.last_obstacle_time > random.uniform(45.0, 60.0):
             # Subsequent obstacles with random intervals
-            self.obstacles.append(Obstacle(50.0))
+            self._spawn_obstacle(50.0)
             self.last_obstacle_time = current_time
         
         # Update obstacles
-        for obstacle in self.obstacles[:]:
-            obstacle.update(self.speed * dt * 10)  # Scale for visual effect
-            
-            # Remove obstacles that are off screen
-            if obstacle.x_pos < -5:
-                self.obstacles.remove(obstacle)
-            
-            # Check collision (if not jumping)
-            elif obstacle.x_pos <= 5 and obstacle.x_pos >= -2 and not self.is_jumping:
-                self.game_over = True
+        self.obstacle_x -= self.speed * dt * 10  # Scale for visual effect
+        
+        # Remove obstacles that are off screen
+        on_screen = self.obstacle_x >= -5
+        self.obstacle_x = self.obstacle_x[on_screen]
+        self.obstacle_cactus = self.obstacle_cactus[on_screen]
+        
+        # Check collision (if not jumping)
+        if not self.is_jumping and ((self.obstacle_x >= -2) & (self.obstacle_x <= 5)).any():
+            self.game_over = True
+    
+    def _spawn_obstacle(self, x_pos: float):
+        """Add a new obstacle at the given position"""
+        obstacle = Obstacle(x_pos)
+        self.obstacle_x = np.append(self.obstacle_x, obstacle.x_pos)
+        self.obstacle_cactus = np.append(self.obstacle_cactus, np.array([obstacle.cactus_type], dtype=object))
+    
+    @property
+    def obstacles(self) -> List[ObstacleView]:
+        """Current obstacles as lightweight views with x_pos and cactus_type"""
+        return [ObstacleView(x, c) for x, c in zip(self.obstacle_x.tolist(), self.obstacle_cactus)]
     
     def jump(self):
         """Make the player jump"""
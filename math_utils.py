@@ -1,7 +1,73 @@
+import math
 import numpy as np
 import matplotlib.pyplot as plt
 from typing import List, Tuple, Optional, Union
 import sympy as sp
+from functools import wraps
+
+def _cached(method):
+    """Cache the result of a no-argument method on the instance"""
+    attr = f"_cached_{method.__name__}"
+    
+    @wraps(method)
+    def wrapper(self):
+        if attr not in self.__dict__:
+            self.__dict__[attr] = method(self)
+        return self.__dict__[attr]
+    
+    return wrapper
+
+def _real_roots(coeffs: np.ndarray) -> List[float]:
+    """Find the distinct real roots of a polynomial given its coefficient array"""
+    coeffs = np.asarray(coeffs, dtype=float).tolist()
+    while coeffs and coeffs[0] == 0:
+        coeffs.pop(0)  # Leading zeros don't change the roots
+    
+    if len(coeffs) <= 3:
+        # Linear and quadratic cases (all the game generates) have closed forms
+        roots = _small_roots(*coeffs)
+    else:
+        # Repeated roots come back as nearly-real conjugate pairs, so allow some slack and
+        # round away the noise so the copies collapse into one
+        roots = [round(root.real, 9) for root in np.roots(coeffs) if abs(root.imag) < 1e-6]
+    
+    return sorted({float(root) + 0.0 for root in roots})
+
+def _small_roots(*coeffs: float) -> List[float]:
+    """Real roots of a polynomial of degree at most 2 with a nonzero leading coefficient"""
+    if len(coeffs) < 2:
+        return []  # Constants have no roots
+    
+    if len(coeffs) == 2:
+        a, b = coeffs
+        return [-b / a]
+    
+    a, b, c = coeffs
+    discriminant = b * b - 4 * a * c
+    if discriminant < 0:
+        return []
+    if discriminant == 0:
+        return [-b / (2 * a)]  # Double root
+    
+    if all(coeff.is_integer() for coeff in coeffs):
+        # The game's coefficients are integers, so the roots can be rounded exactly
+        return _integer_quadratic_roots(int(a), int(b), int(c))
+    
+    # Numerically stable form that avoids subtracting nearly equal values
+    q = -(b + math.copysign(math.sqrt(discriminant), b)) / 2
+    return [q / a, c / q]
+
+# Fixed-point scale for the integer square root in _integer_quadratic_roots
+_ROOT_SCALE = 1 << 64
+
+def _integer_quadratic_roots(a: int, b: int, c: int) -> List[float]:
+    """Correctly rounded roots of ax^2 + bx + c for integers with a positive discriminant"""
+    # sqrt(D) in fixed point; exact when D is a perfect square, within 2^-64 otherwise
+    sqrt_scaled = math.isqrt((b * b - 4 * a * c) * _ROOT_SCALE * _ROOT_SCALE)
+    
+    # Integer true division is correctly rounded, so only the final step rounds
+    denominator = 2 * a * _ROOT_SCALE
+    return [(-b * _ROOT_SCALE - sqrt_scaled) / denominator, (-b * _ROOT_SCALE + sqrt_scaled) / denominator]
 
 class RationalFunction:
     """Represents a rational function and provides analysis methods"""
@@ -15,114 +81,101 @@ class RationalFunction:
         self.numerator = numerator
         self.denominator = denominator
         
+        # Numeric coefficient arrays for fast vectorized evaluation
+        self._num_arr = np.asarray(numerator, dtype=float)
+        self._den_arr = np.asarray(denominator, dtype=float)
+        
         # Create sympy polynomials for easier manipulation
         x = sp.Symbol('x')
-        self.num_poly = sum(coeff * x**(len(numerator) - 1 - i) for i, coeff in enumerate(numerator))
-        self.den_poly = sum(coeff * x**(len(denominator) - 1 - i) for i, coeff in enumerate(denominator))
+        self.num_poly = sp.Poly(numerator, x)
+        self.den_poly = sp.Poly(denominator, x)
         
         # Simplify by finding common factors
+        self._common_factor = sp.gcd(self.num_poly, self.den_poly)
         self.simplified_num, self.simplified_den = self._simplify()
+        
+        # Numeric coefficients of the simplified function for root finding
+        self._simplified_num_arr = np.array(self.simplified_num.all_coeffs(), dtype=float)
+        self._simplified_den_arr = np.array(self.simplified_den.all_coeffs(), dtype=float)
+        
+        # Degrees and leading coefficients used by asymptote/end behavior analysis
+        self.num_degree = len(self._simplified_num_arr) - 1 if self._simplified_num_arr.any() else -1
+        self.den_degree = len(self._simplified_den_arr) - 1
+        self.num_leading = float(self._simplified_num_arr[0])
+        self.den_leading = float(self._simplified_den_arr[0])
     
     def _simplify(self) -> Tuple[sp.Poly, sp.Poly]:
         """Simplify the rational function by canceling common factors"""
-        x = sp.Symbol('x')
-        
-        # Factor numerator and denominator
-        num_factored = sp.factor(self.num_poly)
-        den_factored = sp.factor(self.den_poly)
+        # Nothing to cancel, so the original polynomials are already reduced
+        if self._common_factor.is_one:
+            return self.num_poly, self.den_poly
         
-        # Find GCD and simplify
-        gcd = sp.gcd(self.num_poly, self.den_poly)
-        simplified_num = sp.simplify(self.num_poly / gcd)
-        simplified_den = sp.simplify(self.den_poly / gcd)
+        # Divide out the GCD exactly
+        simplified_num = sp.quo(self.num_poly, self._common_factor)
+        simplified_den = sp.quo(self.den_poly, self._common_factor)
         
         return simplified_num, simplified_den
     
+    @_cached
     def vertical_asymptotes(self) -> List[float]:
         """Find vertical asymptotes"""
-        x = sp.Symbol('x')
-        
-        # Find zeros of simplified denominator
-        den_zeros = sp.solve(self.simplified_den, x)
-        
-        # Filter out complex solutions and convert to float
-        va = []
-        for zero in den_zeros:
-            if zero.is_real:
-                va.append(float(zero))
-        
-        return sorted(va)
+        # Find real zeros of simplified denominator
+        return _real_roots(self._simplified_den_arr)
     
+    @_cached
     def horizontal_asymptote(self) -> Optional[float]:
         """Find horizontal asymptote"""
-        # Get degrees of numerator and denominator
-        num_degree = sp.degree(self.simplified_num)
-        den_degree = sp.degree(self.simplified_den)
-        
-        if num_degree < den_degree:
+        if self.num_degree < self.den_degree:
             return 0.0
-        elif num_degree == den_degree:
+        elif self.num_degree == self.den_degree:
             # Ratio of leading coefficients
-            num_leading = float(sp.LC(self.simplified_num))
-            den_leading = float(sp.LC(self.simplified_den))
-            return num_leading / den_leading
+            return self.num_leading / self.den_leading
         else:
             return None  # No horizontal asymptote
     
+    @_cached
     def holes(self) -> List[Tuple[float, float]]:
         """Find holes (removable discontinuities)"""
         x = sp.Symbol('x')
         
-        # Find common factors between original numerator and denominator
-        gcd = sp.gcd(self.num_poly, self.den_poly)
-        
-        if gcd == 1:
+        # Holes come from common factors between original numerator and denominator
+        if self._common_factor.is_one:
             return []
         
         # Find zeros of the GCD
-        hole_x_values = sp.solve(gcd, x)
+        hole_x_values = sp.solve(self._common_factor, x)
         
         holes = []
         for x_val in hole_x_values:
             if x_val.is_real:
                 x_float = float(x_val)
-                # Calculate y-coordinate by substituting into simplified function
-                try:
-                    y_val = float(self.simplified_num.subs(x, x_val) / self.simplified_den.subs(x, x_val))
-                    holes.append((x_float, y_val))
-                except:
-                    pass  # Skip if calculation fails
+                # Calculate y-coordinate exactly, so a zero comes out as 0.0 rather than -0.0
+                y_val = self.simplified_num.eval(x_val) / self.simplified_den.eval(x_val)
+                if y_val.is_finite:
+                    holes.append((x_float, float(y_val)))
         
         return holes
     
+    @_cached
     def x_intercepts(self) -> List[float]:
         """Find x-intercepts"""
-        x = sp.Symbol('x')
-        
-        # Find zeros of simplified numerator
-        num_zeros = sp.solve(self.simplified_num, x)
-        
-        x_ints = []
-        for zero in num_zeros:
-            if zero.is_real:
-                x_ints.append(float(zero))
-        
-        return sorted(x_ints)
+        # Find real zeros of simplified numerator
+        return _real_roots(self._simplified_num_arr)
     
+    @_cached
     def y_intercept(self) -> Optional[float]:
         """Find y-intercept"""
-        x = sp.Symbol('x')
+        # At x = 0 each polynomial is just its constant term
+        num_constant = float(self._simplified_num_arr[-1])
+        den_constant = float(self._simplified_den_arr[-1])
         
         # Check if x = 0 is in domain
-        if self.simplified_den.subs(x, 0) == 0:
+        if den_constant == 0:
             return None
         
-        try:
-            y_int = float(self.simplified_num.subs(x, 0) / self.simplified_den.subs(x, 0))
-            return y_int
-        except:
-            return None
+        return num_constant / den_constant + 0.0  # Adding 0.0 turns -0.0 into 0.0
     
+    @_cached
     def end_behavior(self) -> str:
         """Determine end behavior"""
         ha = self.horizontal_asymptote()
@@ -136,14 +189,8 @@ class RationalFunction:
                 return f"approaches {ha}"
         else:
             # Check if function goes to infinity or negative infinity
-            num_degree = sp.degree(self.simplified_num)
-            den_degree = sp.degree(self.simplified_den)
-            
-            if num_degree > den_degree:
-                num_leading = float(sp.LC(self.simplified_num))
-                den_leading = float(sp.LC(self.simplified_den))
-                
-                if (num_leading / den_leading) > 0:
+            if self.num_degree > self.den_degree:
+                if (self.num_leading / self.den_leading) > 0:
                     return "approaches infinity"
                 else:
                     return "approaches -infinity"
@@ -152,29 +199,57 @@ class RationalFunction:
     
     def evaluate(self, x_val: float) -> float:
         """Evaluate the function at a given x value"""
-        x = sp.Symbol('x')
-        
-        try:
-            result = float(self.simplified_num.subs(x, x_val) / self.simplified_den.subs(x, x_val))
-            return result
-        except:
+        # Numeric evaluation of the simplified polynomials, no sympy substitution
+        den = np.polyval(self._simplified_den_arr, x_val)
+        if den == 0:
             return float('inf')  # Return infinity if undefined
+        
+        return float(np.polyval(self._simplified_num_arr, x_val) / den)
     
-    def plot(self, ax, x_range: Tuple[float, float] = (-10, 10), num_points: int = 300):
-        """Plot the rational function"""
-        x_vals = np.linspace(x_range[0], x_range[1], num_points)
-        y_vals = []
+    def evaluate_array(self, x_vals: np.ndarray) -> np.ndarray:
+        """Evaluate the function at many x values at once (NaN where undefined)"""
+        x_vals = np.asarray(x_vals, dtype=float)
+        num = np.polyval(self._num_arr, x_vals)
+        den = np.polyval(self._den_arr, x_vals)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            y_vals = num / den
+        
+        # np.where rather than masked assignment so scalar (0-d) input works too
+        return np.where((np.abs(den) < 1e-9) | ~np.isfinite(y_vals), np.nan, y_vals)
+    
+    def _sample_x(self, x_range: Tuple[float, float], num_points: int) -> np.ndarray:
+        """Pick x values for plotting, packed densely near vertical asymptotes"""
+        start, stop = x_range
+        vas = [va for va in self.vertical_asymptotes() if start < va < stop]
+        edges = [start] + vas + [stop]
+        
+        segments = []
+        for i, (a, b) in enumerate(zip(edges[:-1], edges[1:])):
+            # Split the points between segments by length
+            n = max(2, int(round(num_points * (b - a) / (stop - start))))
+            t = np.linspace(0.0, 1.0, n)
+            
+            # Cosine spacing clusters samples at whichever ends are asymptotes
+            left_va, right_va = i > 0, i < len(edges) - 2
+            if left_va and right_va:
+                t = (1 - np.cos(np.pi * t)) / 2
+            elif left_va:
+                t = 1 - np.cos(np.pi * t / 2)
+            elif right_va:
+                t = np.sin(np.pi * t / 2)
+            
+            segments.append(a + (b - a) * t)
         
-        for x_val in x_vals:
-            try:
-                y_val = self.evaluate(x_val)
-                if abs(y_val) > 50:  # Clip extreme values for better visualization
-                    y_val = np.inf if y_val > 0 else -np.inf
-                y_vals.append(y_val)
-            except:
-                y_vals.append(np.inf)
+        return np.concatenate(segments)
+    
+    def plot(self, ax, x_range: Tuple[float, float] = (-10, 10), num_points: int = 120):
+        """Plot the rational function"""
+        x_vals = self._sample_x(x_range, num_points)
+        y_vals = self.evaluate_array(x_vals)
         
-        y_vals = np.array(y_vals)
+        # Clip extreme values for better visualization; NaNs break the line at asymptotes
+        y_vals[np.abs(y_vals) > 50] = np.nan
         
         # Plot the function
         ax.plot(x_vals, y_vals, 'b-', linewidth=1.5, label='f(x)')
@@ -215,16 +290,17 @@ class RationalFunction:
         by_label = dict(zip(labels, handles))
         ax.legend(by_label.values(), by_label.keys(), fontsize=6, loc='upper right')
     
+    @_cached
     def to_latex(self) -> str:
         """Convert the function to LaTeX format"""
         x = sp.Symbol('x')
         
         # Convert coefficients to LaTeX
-        num_latex = sp.latex(self.num_poly)
-        den_latex = sp.latex(self.den_poly)
+        num_latex = sp.latex(self.num_poly.as_expr())
+        den_latex = sp.latex(self.den_poly.as_expr())
         
         return f"f(x) = \\frac{{{num_latex}}}{{{den_latex}}}"
     
     def __str__(self) -> str:
         """String representation of the function"""
-        return f"f(x) = ({self.num_poly}) / ({self.den_poly})"
+        return f"f(x) = ({self.num_poly.as_expr()}) / ({self.den_poly.as_expr()})"
@@ -1,8 +1,80 @@
-import random
 import numpy as np
-from typing import List, Tuple, Dict, Any
+from functools import lru_cache
+from itertools import combinations, product
+from typing import List, NamedTuple, Optional, Tuple, Dict, Any
 from math_utils import RationalFunction
 
+# Candidate values for distractor options
+_POOL_N5 = tuple(range(-5, 6))
+_POOL_N3 = tuple(range(-3, 4))
+_POINTS_N3 = tuple(product(_POOL_N3, repeat=2))
+_PAIRS_N5 = tuple(combinations(_POOL_N5, 2))
+
+# Pre-formatted option strings for the integer distractor values
+_X_EQ = {i: f"x = {i}" for i in range(-20, 21)}
+_Y_EQ = {i: f"y = {i}" for i in range(-20, 21)}
+_YINT_POINT = {i: f"(0, {i})" for i in range(-20, 21)}
+_XINT_POINT = {i: f"({i}, 0)" for i in range(-20, 21)}
+_HOLE_POINT = {(x, y): f"({x}, {y})" for x, y in _POINTS_N3}
+_XINT_PAIR = {(x1, x2): f"{_XINT_POINT[x1]}, {_XINT_POINT[x2]}" for x1, x2 in _PAIRS_N5}
+
+# Distractor candidates per question type: value -> option string
+_X_EQ_N5 = {i: _X_EQ[i] for i in _POOL_N5}
+_Y_EQ_N3 = {i: _Y_EQ[i] for i in _POOL_N3}
+_YINT_POINT_N5 = {i: _YINT_POINT[i] for i in _POOL_N5}
+_XINT_POINT_N5 = {i: _XINT_POINT[i] for i in _POOL_N5}
+
+# Fixed options for questions whose answer is "none"
+_VA_NONE_OPTS = ("none", "x = 0", "x = 1", "x = -1")
+_HA_NONE_OPTS = ("none", "y = 0", "y = 1", "y = -1")
+_HOLE_NONE_OPTS = ("none", "(0, 0)", "(1, 1)", "(-1, -1)")
+_YINT_NONE_OPTS = ("none", "(0, 0)", "(0, 1)", "(0, -1)")
+_XINT_NONE_OPTS = ("none", "(0, 0)", "(1, 0)", "(-1, 0)")
+
+class _QuestionSpec(NamedTuple):
+    """Everything that differs between the multiple choice question types"""
+    method: str  # RationalFunction method giving the answer
+    prompts: Tuple[str, str, str]  # Question text for no, one and several answers
+    answer_format: str  # Format for each answer value
+    max_shown: int  # How many answer values go into the correct option
+    candidates: Tuple[Dict[Any, str], ...]  # Distractors for one and for several answers
+    none_options: Tuple[str, ...]  # Options when there is no answer
+
+# Question prompts
+_VA_ONE = "What is the vertical asymptote of this function?"
+_VA_MANY = "What are the vertical asymptotes of this function?"
+_HA_ONE = "What is the horizontal asymptote of this function?"
+_HOLE_NONE = "Does this function have any holes? If so, where?"
+_HOLE_ONE = "Where is the hole in this function?"
+_YINT_ONE = "What is the y-intercept of this function?"
+_XINT_ONE = "What is the x-intercept of this function?"
+_XINT_MANY = "What are the x-intercepts of this function?"
+_END_BEHAVIOR = "What is the end behavior of this function as x approaches infinity?"
+
+# End behaviors offered as options, in the order they fill up the choices
+_BEHAVIORS = ("approaches 0", "approaches 1", "approaches -1", "approaches infinity", "approaches -infinity")
+
+_QUESTION_SPECS = (
+    _QuestionSpec("vertical_asymptotes", (_VA_ONE, _VA_ONE, _VA_MANY),
+                  "x = {0}", 2, (_X_EQ_N5, _X_EQ_N5), _VA_NONE_OPTS),
+    _QuestionSpec("horizontal_asymptote", (_HA_ONE, _HA_ONE, _HA_ONE),
+                  "y = {0}", 1, (_Y_EQ_N3,), _HA_NONE_OPTS),
+    _QuestionSpec("holes", (_HOLE_NONE, _HOLE_ONE, _HOLE_ONE),
+                  "({0[0]}, {0[1]})", 1, (_HOLE_POINT,), _HOLE_NONE_OPTS),
+    _QuestionSpec("y_intercept", (_YINT_ONE, _YINT_ONE, _YINT_ONE),
+                  "(0, {0})", 1, (_YINT_POINT_N5,), _YINT_NONE_OPTS),
+    _QuestionSpec("x_intercepts", (_XINT_MANY, _XINT_ONE, _XINT_MANY),
+                  "({0}, 0)", 2, (_XINT_POINT_N5, _XINT_PAIR), _XINT_NONE_OPTS),
+)
+
+# Translation table that deletes spaces from text answers
+_STRIP_SPACES = str.maketrans("", "", " ")
+
+@lru_cache(maxsize=1024)
+def _build_function(numerator: Tuple[int, ...], denominator: Tuple[int, ...]) -> RationalFunction:
+    """Build a RationalFunction, reusing the instance (and its cached analysis) for repeated coefficients"""
+    return RationalFunction(list(numerator), list(denominator))
+
 class Question:
     """Represents a single question about rational functions"""
     def __init__(self, function: RationalFunction, question: str, correct_answer: str, 
@@ -12,27 +84,52 @@ class Question:
         self.correct_answer = correct_answer
         self.question_type = question_type
         self.options = options or []
+        
+        # The correct answer never changes, so normalize it once up front
+        if question_type != "multiple_choice":
+            self._norm_correct = self._normalize(correct_answer)
+    
+    @staticmethod
+    def _normalize(answer: str) -> str:
+        """Normalize a text answer so formatting differences don't matter"""
+        # Handle common mathematical expressions
+        return answer.strip().lower().translate(_STRIP_SPACES).replace("y=", "").replace("x=", "")
     
     def check_answer(self, answer: str) -> bool:
         """Check if the provided answer is correct"""
         if self.question_type == "multiple_choice":
             return answer == self.correct_answer
-        else:
-            # For text answers, be flexible with formatting
-            answer = answer.strip().lower()
-            correct = self.correct_answer.strip().lower()
-            
-            # Handle common mathematical expressions
-            answer = answer.replace(" ", "").replace("y=", "").replace("x=", "")
-            correct = correct.replace(" ", "").replace("y=", "").replace("x=", "")
-            
-            return answer == correct
+        
+        # For text answers, be flexible with formatting
+        return self._normalize(answer) == self._norm_correct
 
 class QuestionGenerator:
     """Generates questions about rational functions"""
-    def __init__(self):
+    # How many uniform draws to take from the generator at a time
+    _RANDOM_BATCH_SIZE = 64
+    
+    def __init__(self, seed: Optional[int] = None):
         self.difficulty_level = 1
         self.questions_answered = 0
+        
+        # Private generator; uniform draws are fetched in batches and handed out one at a time
+        self._rng = np.random.default_rng(seed)
+        self._uniforms: List[float] = []
+        self._next_uniform = 0
+    
+    def _randint(self, low: int, high: int) -> int:
+        """Random integer in [low, high], like random.randint, taken from the pre-drawn batch"""
+        if self._next_uniform >= len(self._uniforms):
+            self._uniforms = self._rng.random(self._RANDOM_BATCH_SIZE).tolist()
+            self._next_uniform = 0
+        
+        u = self._uniforms[self._next_uniform]
+        self._next_uniform += 1
+        return low + int(u * (high - low + 1))
+    
+    def _sample(self, population: List, k: int) -> List:
+        """Pick k distinct items from population, like random.sample"""
+        return [population[i] for i in self._rng.choice(len(population), k, replace=False)]
     
     def generate_question(self) -> Question:
         """Generate a new question based on current difficulty"""
@@ -43,27 +140,60 @@ class QuestionGenerator:
         function = self._generate_random_function()
         
         # Choose question type
-        question_types = [
-            "vertical_asymptote",
-            "horizontal_asymptote", 
-            "hole",
-            "y_intercept",
-            "x_intercept",
-            "end_behavior"
-        ]
-        
-        question_type = random.choice(question_types)
-        question = self._generate_question_by_type(function, question_type)
+        question = self._question_of_type(function, self._randint(0, len(_QUESTION_SPECS)))
         
         self.questions_answered += 1
         return question
     
+    def generate_batch(self, n: int) -> List[Question]:
+        """Generate n questions at once, drawing all their random numbers in a single call each"""
+        # Difficulty each question would get if they were generated one by one
+        levels = np.minimum(5, 1 + (self.questions_answered + np.arange(n)) // 5)
+        
+        # Coefficients a-f for every question; quadratic leading terms come from [-3, 3]
+        limits = np.full((n, 6), 5)
+        limits[levels >= 2, 0] = 3
+        limits[levels >= 3, 3] = 3
+        coefficients = self._rng.integers(-limits, limits + 1).tolist()
+        types = self._rng.integers(0, len(_QUESTION_SPECS) + 1, size=n).tolist()
+        
+        questions = []
+        for level, (a, b, c, d, e, f), question_type in zip(levels.tolist(), coefficients, types):
+            if level >= 2 and a == 0:
+                a = 1
+            if d == 0:
+                d = 1
+            
+            # Same shapes as _generate_random_function for each difficulty
+            if level == 1:
+                numerator, denominator = (a, b), (d, e)
+            elif level == 2:
+                numerator, denominator = (a, b, c), (d, e)
+            else:
+                numerator, denominator = (a, b, c), (d, e, f)
+            
+            function = _build_function(numerator, denominator)
+            questions.append(self._question_of_type(function, question_type))
+        
+        if n > 0:
+            self.difficulty_level = int(levels[-1])
+        self.questions_answered += n
+        return questions
+    
+    def _question_of_type(self, function: RationalFunction, question_type: int) -> Question:
+        """Build the question for a question type index"""
+        if question_type < len(_QUESTION_SPECS):
+            return self._make_question(function, _QUESTION_SPECS[question_type])
+        
+        # The slot after the specs is end behavior, which has fixed options
+        return self._end_behavior_question(function)
+    
     def _generate_random_function(self) -> RationalFunction:
         """Generate a random rational function based on difficulty"""
         if self.difficulty_level == 1:
             # Simple functions: (ax + b) / (cx + d)
-            a, b = random.randint(-5, 5), random.randint(-5, 5)
-            c, d = random.randint(-5, 5), random.randint(-5, 5)
+            a, b = self._randint(-5, 5), self._randint(-5, 5)
+            c, d = self._randint(-5, 5), self._randint(-5, 5)
             if c == 0:
                 c = 1
             numerator = [a, b]
@@ -71,8 +201,8 @@ class QuestionGenerator:
         
         elif self.difficulty_level == 2:
             # Medium functions: (ax^2 + bx + c) / (dx + e)
-            a, b, c = random.randint(-3, 3), random.randint(-5, 5), random.randint(-5, 5)
-            d, e = random.randint(-5, 5), random.randint(-5, 5)
+            a, b, c = self._randint(-3, 3), self._randint(-5, 5), self._randint(-5, 5)
+            d, e = self._randint(-5, 5), self._randint(-5, 5)
             if a == 0:
                 a = 1
             if d == 0:
@@ -82,8 +212,8 @@ class QuestionGenerator:
         
         else:
             # Complex functions: (ax^2 + bx + c) / (dx^2 + ex + f)
-            a, b, c = random.randint(-3, 3), random.randint(-5, 5), random.randint(-5, 5)
-            d, e, f = random.randint(-3, 3), random.randint(-5, 5), random.randint(-5, 5)
+            a, b, c = self._randint(-3, 3), self._randint(-5, 5), self._randint(-5, 5)
+            d, e, f = self._randint(-3, 3), self._randint(-5, 5), self._randint(-5, 5)
             if a == 0:
                 a = 1
             if d == 0:
@@ -91,147 +221,37 @@ class QuestionGenerator:
             numerator = [a, b, c]
             denominator = [d, e, f]
         
-        return RationalFunction(numerator, denominator)
-    
-    def _generate_question_by_type(self, function: RationalFunction, question_type: str) -> Question:
-        """Generate a specific type of question"""
-        if question_type == "vertical_asymptote":
-            return self._vertical_asymptote_question(function)
-        elif question_type == "horizontal_asymptote":
-            return self._horizontal_asymptote_question(function)
-        elif question_type == "hole":
-            return self._hole_question(function)
-        elif question_type == "y_intercept":
-            return self._y_intercept_question(function)
-        elif question_type == "x_intercept":
-            return self._x_intercept_question(function)
-        elif question_type == "end_behavior":
-            return self._end_behavior_question(function)
-        else:
-            return self._vertical_asymptote_question(function)
-    
-    def _vertical_asymptote_question(self, function: RationalFunction) -> Question:
-        """Generate a vertical asymptote question"""
-        va = function.vertical_asymptotes()
-        
-        if len(va) == 0:
-            correct = "none"
-            question = "What is the vertical asymptote of this function?"
-        elif len(va) == 1:
-            correct = f"x = {va[0]}"
-            question = "What is the vertical asymptote of this function?"
-        else:
-            correct = f"x = {va[0]}, x = {va[1]}"
-            question = "What are the vertical asymptotes of this function?"
-        
-        # Create multiple choice options
-        options = [correct]
-        for _ in range(3):
-            fake_x = random.randint(-5, 5)
-            while fake_x in va:
-                fake_x = random.randint(-5, 5)
-            options.append(f"x = {fake_x}")
-        
-        if len(va) == 0:
-            options = ["none", "x = 0", "x = 1", "x = -1"]
-        
-        random.shuffle(options)
-        
-        return Question(function, question, correct, "multiple_choice", options)
+        return _build_function(tuple(numerator), tuple(denominator))
     
-    def _horizontal_asymptote_question(self, function: RationalFunction) -> Question:
-        """Generate a horizontal asymptote question"""
-        ha = function.horizontal_asymptote()
+    def _make_question(self, function: RationalFunction, spec: _QuestionSpec) -> Question:
+        """Generate a multiple choice question from its spec"""
+        result = getattr(function, spec.method)()
         
-        if ha is None:
-            correct = "none"
-            question = "What is the horizontal asymptote of this function?"
-            options = ["none", "y = 0", "y = 1", "y = -1"]
+        # Methods return a list, a single value, or None; treat them all as a list
+        if result is None:
+            values = []
+        elif isinstance(result, list):
+            values = result
         else:
-            correct = f"y = {ha}"
-            question = "What is the horizontal asymptote of this function?"
-            options = [correct]
-            for _ in range(3):
-                fake_y = random.randint(-3, 3)
-                while fake_y == ha:
-                    fake_y = random.randint(-3, 3)
-                options.append(f"y = {fake_y}")
+            values = [result]
         
-        random.shuffle(options)
+        shown = values[:spec.max_shown]
+        question = spec.prompts[min(len(shown), 2)]
         
-        return Question(function, question, correct, "multiple_choice", options)
-    
-    def _hole_question(self, function: RationalFunction) -> Question:
-        """Generate a hole question"""
-        holes = function.holes()
-        
-        if len(holes) == 0:
-            correct = "none"
-            question = "Does this function have any holes? If so, where?"
-            options = ["none", "(0, 0)", "(1, 1)", "(-1, -1)"]
-        else:
-            hole_x, hole_y = holes[0]
-            correct = f"({hole_x}, {hole_y})"
-            question = "Where is the hole in this function?"
-            options = [correct]
-            for _ in range(3):
-                fake_x = random.randint(-3, 3)
-                fake_y = random.randint(-3, 3)
-                options.append(f"({fake_x}, {fake_y})")
-        
-        random.shuffle(options)
-        
-        return Question(function, question, correct, "multiple_choice", options)
-    
-    def _y_intercept_question(self, function: RationalFunction) -> Question:
-        """Generate a y-intercept question"""
-        y_int = function.y_intercept()
-        
-        if y_int is None:
-            correct = "none"
-            question = "What is the y-intercept of this function?"
-            options = ["none", "(0, 0)", "(0, 1)", "(0, -1)"]
-        else:
-            correct = f"(0, {y_int})"
-            question = "What is the y-intercept of this function?"
-            options = [correct]
-            for _ in range(3):
-                fake_y = random.randint(-5, 5)
-                while fake_y == y_int:
-                    fake_y = random.randint(-5, 5)
-                options.append(f"(0, {fake_y})")
-        
-        random.shuffle(options)
-        
-        return Question(function, question, correct, "multiple_choice", options)
-    
-    def _x_intercept_question(self, function: RationalFunction) -> Question:
-        """Generate an x-intercept question"""
-        x_ints = function.x_intercepts()
-        
-        if len(x_ints) == 0:
+        # Create multiple choice options
+        if len(shown) == 0:
             correct = "none"
-            question = "What are the x-intercepts of this function?"
-            options = ["none", "(0, 0)", "(1, 0)", "(-1, 0)"]
-        elif len(x_ints) == 1:
-            correct = f"({x_ints[0]}, 0)"
-            question = "What is the x-intercept of this function?"
-            options = [correct]
-            for _ in range(3):
-                fake_x = random.randint(-5, 5)
-                while fake_x == x_ints[0]:
-                    fake_x = random.randint(-5, 5)
-                options.append(f"({fake_x}, 0)")
+            options = list(spec.none_options)
         else:
-            correct = f"({x_ints[0]}, 0), ({x_ints[1]}, 0)"
-            question = "What are the x-intercepts of this function?"
-            options = [correct]
-            for _ in range(3):
-                fake_x1 = random.randint(-5, 5)
-                fake_x2 = random.randint(-5, 5)
-                options.append(f"({fake_x1}, 0), ({fake_x2}, 0)")
+            correct = ", ".join([spec.answer_format.format(value) for value in shown])
+            candidates = spec.candidates[len(shown) - 1]
+            
+            # Leave out the real answers, both as single values and as a pair
+            excluded = shown + [tuple(shown)]
+            fakes = self._sample([value for value in candidates if value not in excluded], 3)
+            options = [correct] + [candidates[value] for value in fakes]
         
-        random.shuffle(options)
+        self._rng.shuffle(options)
         
         return Question(function, question, correct, "multiple_choice", options)
     
@@ -239,16 +259,14 @@ class QuestionGenerator:
         """Generate an end behavior question"""
         end_behavior = function.end_behavior()
         
-        question = "What is the end behavior of this function as x approaches infinity?"
+        question = _END_BEHAVIOR
         correct = end_behavior
         
         options = [correct]
-        behaviors = ["approaches 0", "approaches 1", "approaches -1", "approaches infinity", "approaches -infinity"]
-        
-        for behavior in behaviors:
+        for behavior in _BEHAVIORS:
             if behavior != correct and len(options) < 4:
                 options.append(behavior)
         
-        random.shuffle(options)
+        self._rng.shuffle(options)
         
         return Question(function, question, correct, "multiple_choice", options)
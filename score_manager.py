@@ -1,50 +1,115 @@
+import atexit
 import json
 import os
-from typing import List, Tuple
+import threading
+import numpy as np
+from typing import Dict, List, Tuple
+
+# orjson is optional; fall back to the standard library when it isn't installed
+try:
+    import orjson
+    
+    def _dumps(data) -> bytes:
+        return orjson.dumps(data)
+    
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(data) -> bytes:
+        return json.dumps(data, separators=(',', ':')).encode('utf-8')
+    
+    _loads = json.loads
 
 class ScoreManager:
     """Manages player scores and leaderboard"""
     def __init__(self, filename: str = "scores.json"):
         self.filename = filename
-        self.scores = self._load_scores()
+        
+        # One instance is shared by every session thread, so updates and saves take this lock
+        self._lock = threading.RLock()
+        self._set_scores(self._load_scores())
+        self._dirty = False
+        
+        # Backstop for scores added without a flush afterwards
+        atexit.register(self.flush)
     
     def _load_scores(self) -> List[Tuple[str, int]]:
         """Load scores from file"""
         try:
             if os.path.exists(self.filename):
-                with open(self.filename, 'r') as f:
-                    data = json.load(f)
-                    return [(item['name'], item['score']) for item in data]
+                with open(self.filename, 'rb') as f:
+                    data = _loads(f.read())
+                    scores = [(item['name'], item['score']) for item in data]
+                    return sorted(scores, key=lambda x: x[1], reverse=True)  # Sort by score descending
             return []
         except (json.JSONDecodeError, KeyError):
             return []
     
+    def _set_scores(self, scores: List[Tuple[str, int]]):
+        """Store scores as parallel name/score arrays sorted by score descending"""
+        self._names = np.array([name for name, _ in scores], dtype=object)
+        self._values = np.array([score for _, score in scores], dtype=np.int64)
+        
+        # Index of each player's best score; the first entry per name is the highest
+        self._best: Dict[str, int] = {}
+        for name, score in scores:
+            self._best.setdefault(name, score)
+    
+    @property
+    def scores(self) -> List[Tuple[str, int]]:
+        """All scores as (name, score) pairs, best first"""
+        with self._lock:
+            return list(zip(self._names.tolist(), self._values.tolist()))
+    
     def _save_scores(self):
         """Save scores to file"""
-        try:
-            data = [{'name': name, 'score': score} for name, score in self.scores]
-            with open(self.filename, 'w') as f:
-                json.dump(data, f, indent=2)
-        except Exception as e:
-            print(f"Error saving scores: {e}")
+        with self._lock:
+            try:
+                # Serialize records straight from the arrays instead of building a list of dicts first
+                records = b",".join(b'{"name":%s,"score":%d}' % (_dumps(name), score)
+                                    for name, score in zip(self._names.tolist(), self._values.tolist()))
+                with open(self.filename, 'wb') as f:
+                    f.write(b"[" + records + b"]")
+                self._dirty = False
+            except Exception as e:
+                print(f"Error saving scores: {e}")
+    
+    def flush(self):
+        """Write scores to file if they changed since the last save"""
+        with self._lock:
+            if self._dirty:
+                self._save_scores()
     
     def add_score(self, name: str, score: int):
         """Add a new score to the leaderboard"""
-        self.scores.append((name, score))
-        self.scores.sort(key=lambda x: x[1], reverse=True)  # Sort by score descending
-        self.scores = self.scores[:50]  # Keep top 50 scores
-        self._save_scores()
+        with self._lock:
+            # Insert after any equal scores so earlier entries keep their place
+            index = int(np.searchsorted(-self._values, -score, side='right'))
+            names = np.insert(self._names, index, name)
+            self._names = names[:50]  # Keep top 50 scores
+            self._values = np.insert(self._values, index, score)[:50]
+            
+            if index < 50 and (name not in self._best or score > self._best[name]):
+                self._best[name] = score
+            
+            # A player whose last remaining entry was pushed off the board has no best anymore
+            for evicted in names[50:]:
+                if not (self._names == evicted).any():
+                    self._best.pop(evicted, None)
+            
+            self._dirty = True
     
     def get_top_scores(self, limit: int = 10) -> List[Tuple[str, int]]:
         """Get top scores"""
-        return self.scores[:limit]
+        with self._lock:
+            return list(zip(self._names[:limit].tolist(), self._values[:limit].tolist()))
     
     def get_player_best(self, name: str) -> int:
         """Get player's best score"""
-        player_scores = [score for n, score in self.scores if n == name]
-        return max(player_scores) if player_scores else 0
+        return self._best.get(name, 0)
     
     def clear_scores(self):
         """Clear all scores"""
-        self.scores = []
-        self._save_scores()
+        with self._lock:
+            self._set_scores([])
+            self._dirty = True
+            self.flush()